@@ -5,14 +5,17 @@ Scanning uses a poll-based approach (not SSE) to work reliably on
 Render's free tier which kills connections after 90s:
   POST /api/scan/start          → starts background scan, returns job_id
   GET  /api/scan/status/<id>    → poll this every second for progress + results
+                                  (?since=<last_seq> returns only new matches)
 """
 
 import os
 import json
+import time
 import logging
 import threading
 import traceback
-from flask import Flask, jsonify, request, redirect
+import orjson
+from flask import Flask, Response, jsonify, request, redirect
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -21,13 +24,14 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
-from strategies import get_strategy, get_strategy_list
+from strategies import get_strategy, get_strategy_list, warm_kernels
 from universe import get_universe, get_universe_names
 from data_provider import exchange_code_for_token, preload_instruments
 from token_manager import get_token_status
 from scan_store import (
     create_job,
     get_job,
+    get_job_version,
     update_progress,
     add_match,
     finish_job,
@@ -39,6 +43,14 @@ app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 
+def _json_response(payload) -> Response:
+    """orjson-serialised response for the hot polling paths."""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        mimetype="application/json",
+    )
+
+
 # ── Auth ──────────────────────────────────────────────────────────────────────
 
 
@@ -114,13 +126,26 @@ def health():
 # ── Strategies & Universes ────────────────────────────────────────────────────
 
 
+# Strategies are registered at import and never change — serialise once.
+_STRATEGIES_JSON = orjson.dumps(get_strategy_list())
+
+# Universe counts only move when an index list is re-fetched (hourly at most).
+_UNIVERSES_JSON_TTL = 3600
+_universes_json: bytes | None = None
+_universes_json_at = 0.0
+
+
 @app.route("/api/strategies")
 def list_strategies():
-    return jsonify(get_strategy_list())
+    return Response(_STRATEGIES_JSON, mimetype="application/json")
 
 
 @app.route("/api/universes")
 def list_universes():
+    global _universes_json, _universes_json_at
+    if _universes_json and time.time() - _universes_json_at < _UNIVERSES_JSON_TTL:
+        return Response(_universes_json, mimetype="application/json")
+
     from concurrent.futures import ThreadPoolExecutor
     names = get_universe_names()
 
@@ -130,7 +155,11 @@ def list_universes():
     with ThreadPoolExecutor(max_workers=len(names)) as pool:
         results = list(pool.map(_fetch, names))
 
-    return jsonify(results)
+    body = orjson.dumps(results)
+    # Don't pin a partial result while NSE fetches are still failing/warming
+    if all(r["count"] for r in results):
+        _universes_json, _universes_json_at = body, time.time()
+    return Response(body, mimetype="application/json")
 
 
 # ── Poll-based Scanner ────────────────────────────────────────────────────────
@@ -148,9 +177,12 @@ def _run_scan_background(job_id: str, strategy, tickers: list):
         finish_job(job_id)
         log.info(f"Job {job_id} complete")
         cleanup_old_jobs()
+        _prune_status_cache()
     except Exception as e:
         log.error(traceback.format_exc())
         fail_job(job_id, str(e))
+        cleanup_old_jobs()
+        _prune_status_cache()
 
 
 @app.route("/api/scan/start", methods=["POST"])
@@ -197,13 +229,37 @@ def scan_start():
     return jsonify({"job_id": job_id, "total": len(tickers)})
 
 
+# { job_id: (since, version, serialised job) } — polls faster than the job
+# changes (e.g. while a slow fetch is in flight) reuse the last body as-is.
+# One entry per job: a poller only ever repeats its latest `since`.
+_status_cache: dict = {}
+
+
+def _prune_status_cache():
+    for job_id in list(_status_cache):
+        if get_job_version(job_id) is None:
+            _status_cache.pop(job_id, None)
+
+
 @app.route("/api/scan/status/<job_id>")
 def scan_status(job_id: str):
-    """Poll this every second to get scan progress and results so far."""
-    job = get_job(job_id)
+    """
+    Poll this every second to get scan progress and results so far.
+    Pass ?since=<last_seq> from the previous poll to receive only new matches.
+    """
+    since = max(request.args.get("since", 0, type=int), 0)
+    version = get_job_version(job_id)
+    cached = _status_cache.get(job_id)
+    if cached and cached[:2] == (since, version):
+        return Response(cached[2], mimetype="application/json")
+
+    job = get_job(job_id, since)
     if not job:
+        _status_cache.pop(job_id, None)
         return jsonify({"error": "Job not found"}), 404
-    return jsonify(job)
+    response = _json_response(job)
+    _status_cache[job_id] = (since, version, response.get_data())
+    return response
 
 
 # ── Keep old /api/scan for local dev convenience ──────────────────────────────
@@ -257,20 +313,34 @@ def _warm_universe_cache():
         try:
             symbols = get_universe(name)
             log.info(f"  {name}: {len(symbols)} symbols cached")
+            return symbols
         except Exception as e:
             log.warning(f"  {name}: cache warm failed — {e}")
+            return []
 
     with ThreadPoolExecutor(max_workers=len(names)) as pool:
-        list(pool.map(_fetch, names))
+        all_symbols = set().union(*pool.map(_fetch, names))
     log.info("Universe cache warm complete")
 
+    # Resolve every universe symbol once so scans start with warm instrument keys
+    preload_instruments(all_symbols)
+
+    # Off the import path — a cold Numba cache takes a few seconds to compile
+    warm_kernels()
+
 
-# ── Module-level startup — runs under gunicorn AND direct python app.py ───────
-threading.Thread(target=_warm_universe_cache, daemon=True).start()
-preload_instruments()
+def start_background_warmup():
+    """
+    Per-server-process startup. Not run at import: spawned scan processes
+    re-import this module as __mp_main__ and must only run _warm_worker.
+    Called from the __main__ block below and gunicorn's post_worker_init.
+    """
+    threading.Thread(target=_warm_universe_cache, daemon=True).start()
+    preload_instruments()
 
 
 if __name__ == "__main__":
+    start_background_warmup()
     port = int(os.environ.get("PORT", 5001))
     status = get_token_status()
     log.info(f"Starting on http://localhost:{port}")
@@ -9,21 +9,31 @@ This will print the exact tradingsymbol for each stock in your universe.
 """
 
 import io
+import csv
+import gzip
+import bisect
 import requests
-import pandas as pd
 from universe import get_universe, get_universe_names
 
 print("Downloading Upstox NSE instrument master...")
 url = "https://assets.upstox.com/market-quote/instruments/exchange/NSE.csv.gz"
 resp = requests.get(url, timeout=30)
-df = pd.read_csv(
-    io.BytesIO(resp.content),
-    compression="gzip",
-    usecols=["tradingsymbol", "instrument_key", "instrument_type", "name"],
-)
-eq = df[df["instrument_type"] == "EQ"]
 
-print(f"Loaded {len(eq)} NSE EQ instruments\n")
+# Stream the CSV straight into lookup dicts — no pandas needed
+by_symbol: dict[str, str] = {}
+by_upper: dict[str, tuple[str, str]] = {}
+with gzip.open(io.BytesIO(resp.content), "rt", newline="") as f:
+    for row in csv.DictReader(f):
+        if row["instrument_type"] != "EQ":
+            continue
+        sym, key = row["tradingsymbol"], row["instrument_key"]
+        by_symbol.setdefault(sym, key)
+        by_upper.setdefault(sym.upper(), (sym, key))
+
+# Sorted upper-cased symbols for prefix suggestions via bisect
+sorted_upper = sorted(by_upper)
+
+print(f"Loaded {len(by_symbol)} NSE EQ instruments\n")
 
 # Check every symbol in every universe
 all_symbols = set()
@@ -36,29 +46,28 @@ print("-" * 70)
 
 missing = []
 for sym in sorted(all_symbols):
-    match = eq[eq["tradingsymbol"] == sym]
-    if not match.empty:
-        key = match.iloc[0]["instrument_key"]
-        print(f"{sym:<20} {'✓ FOUND':<10} {key}")
+    if sym in by_symbol:
+        print(f"{sym:<20} {'✓ FOUND':<10} {by_symbol[sym]}")
+    elif sym.upper() in by_upper:
+        # Case-insensitive match
+        actual, key = by_upper[sym.upper()]
+        print(f"{sym:<20} {'~ CASE':<10} actual='{actual}' key={key}")
+        missing.append((sym, actual))
     else:
-        # Try case-insensitive search
-        close = eq[eq["tradingsymbol"].str.upper() == sym.upper()]
-        if not close.empty:
-            actual = close.iloc[0]["tradingsymbol"]
-            key = close.iloc[0]["instrument_key"]
-            print(f"{sym:<20} {'~ CASE':<10} actual='{actual}' key={key}")
-            missing.append((sym, actual))
+        # Partial match — upper-cased symbols starting with sym
+        prefix = sym.upper()
+        suggestions = []
+        i = bisect.bisect_left(sorted_upper, prefix)
+        while i < len(sorted_upper) and len(suggestions) < 3:
+            if not sorted_upper[i].startswith(prefix):
+                break
+            suggestions.append(by_upper[sorted_upper[i]][0])
+            i += 1
+        if suggestions:
+            print(f"{sym:<20} {'? PARTIAL':<10} suggestions: {suggestions}")
         else:
-            # Try partial match
-            partial = eq[
-                eq["tradingsymbol"].str.contains(f"^{sym}", case=False, na=False)
-            ]
-            if not partial.empty:
-                suggestions = partial["tradingsymbol"].tolist()[:3]
-                print(f"{sym:<20} {'? PARTIAL':<10} suggestions: {suggestions}")
-            else:
-                print(f"{sym:<20} {'✗ MISSING':<10} not found in Upstox master")
-            missing.append((sym, None))
+            print(f"{sym:<20} {'✗ MISSING':<10} not found in Upstox master")
+        missing.append((sym, None))
 
 print(f"\n{len(missing)} symbols need attention:")
 for sym, actual in missing:
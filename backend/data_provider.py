@@ -2,24 +2,45 @@
 data_provider.py — Fetches OHLCV data from Upstox API v2.
 
 Optimised for concurrent use:
-  - Shared requests.Session with connection pooling (reuses TCP connections)
-  - Thread-safe instrument cache loaded once at startup
-  - SQLite OHLCV cache: avoids redundant Upstox calls within the same trading day
-  - No artificial delays — Upstox handles concurrent requests fine
+  - Shared HTTP/2 httpx clients — concurrent fetches multiplex over a few
+    pooled connections and repeated headers are HPACK-compressed
+  - Batch fetches run as coroutines on one background asyncio loop, so a
+    cold-cache scan keeps HTTP_POOL_SIZE requests in flight without a thread each
+  - Thread-safe instrument cache loaded once at startup, from a local copy of
+    the master that is revalidated daily with a conditional GET
+  - SQLite OHLCV cache: avoids redundant Upstox calls within the same trading day,
+    and on a new day only the missing candles are fetched
+  - Token-bucket rate limiting for Upstox's per-second / per-minute /
+    per-30-minute caps — no fixed stagger, requests go out as fast as allowed;
+    shared through Redis when several gunicorn workers are running
 """
 
 import os
-import io
+import re
+import bisect
 import json
 import sqlite3
+import asyncio
+import tempfile
 import logging
 import threading
-import requests
+import httpx
+import redis.asyncio as aioredis
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
+from email.utils import formatdate
+from functools import lru_cache
+from time import monotonic, sleep, time as wall_time
+from urllib.parse import quote
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
 from token_manager import get_valid_token, save_token
+from settings import shared_store_url
 
 load_dotenv()
 
@@ -47,78 +68,546 @@ def _init_ohlcv_db():
                     as_of_date  TEXT NOT NULL,
                     fetched_at  TEXT NOT NULL,
                     candles_json TEXT NOT NULL,
+                    history_from TEXT,
                     PRIMARY KEY (symbol, as_of_date)
                 )
             """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ohlcv_cache)")}
+            if "history_from" not in columns:  # databases created before the column
+                try:
+                    conn.execute("ALTER TABLE ohlcv_cache ADD COLUMN history_from TEXT")
+                except sqlite3.OperationalError:
+                    pass  # another worker added it first
             conn.commit()
         _db_init_done = True
 
 
-def _cache_get(symbol: str, as_of_date: str) -> pd.DataFrame | None:
+_OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _rows_to_df(rows: list) -> pd.DataFrame:
+    """
+    [date, open, high, low, close, volume, ...] rows → float64 OHLCV frame.
+    One 2-D cast for all five value columns — no per-column coercion.
+    """
+    arr = np.asarray(rows, dtype=object)
+    dates = pd.to_datetime(arr[:, 0])
+    if dates.tz is not None:
+        # Drop the +05:30 offset so fresh and cached frames share a naive IST index
+        dates = dates.tz_localize(None)
+    df = pd.DataFrame(
+        arr[:, 1:6].astype(np.float64),
+        index=dates.rename("Date"),
+        columns=_OHLCV_COLUMNS,
+    )
+    return df.sort_index()
+
+
+def _cached_candles_to_df(candles_json: str) -> pd.DataFrame:
+    return _rows_to_df(json.loads(candles_json))
+
+
+def _history_from(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value else None
+
+
+# ── In-process frame cache ────────────────────────────────────────────────────
+# Decoding candles_json dominates a warm rescan, so the parsed frames of recent
+# (symbol, as_of_date) entries stay in an LRU in front of SQLite, each with the
+# date its history is complete from. Cached frames are shared read-only: every
+# read path hands out a _covering() slice.
+_FRAME_CACHE_SIZE = 1024  # ≈ 15 KB per 365-bar frame
+_frames: OrderedDict = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def _frame_get(symbol: str, as_of_date: str) -> tuple | None:
+    """(df, history_from) for a cached entry, or None."""
+    key = (symbol, as_of_date)
+    with _frames_lock:
+        entry = _frames.get(key)
+        if entry is not None:
+            _frames.move_to_end(key)
+        return entry
+
+
+def _frame_put(
+    symbol: str, as_of_date: str, df: pd.DataFrame, history_from: date | None
+):
+    key = (symbol, as_of_date)
+    with _frames_lock:
+        _frames[key] = (df, history_from)
+        _frames.move_to_end(key)
+        while len(_frames) > _FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+
+
+def _cache_get_latest(symbol: str) -> tuple[pd.DataFrame | None, date | None]:
+    """Most recent cached (candles, history_from) for symbol, any as_of_date."""
     _init_ohlcv_db()
     try:
         with sqlite3.connect(_DB_PATH) as conn:
             row = conn.execute(
-                "SELECT candles_json FROM ohlcv_cache WHERE symbol=? AND as_of_date=?",
-                (symbol, as_of_date),
+                "SELECT candles_json, history_from FROM ohlcv_cache WHERE symbol=? "
+                "ORDER BY as_of_date DESC LIMIT 1",
+                (symbol,),
             ).fetchone()
         if not row:
-            return None
-        candles = json.loads(row[0])
-        df = pd.DataFrame(candles, columns=["Date", "Open", "High", "Low", "Close", "Volume"])
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.set_index("Date").sort_index()
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        return df.dropna(how="all")
+            return None, None
+        return _cached_candles_to_df(row[0]), _history_from(row[1])
     except Exception as e:
         log.warning(f"OHLCV cache read error for {symbol}: {e}")
-        return None
+        return None, None
+
 
+_CACHE_BATCH = 500  # stays under SQLite's host-parameter limit
 
-def _cache_set(symbol: str, as_of_date: str, df: pd.DataFrame):
+
+def _cache_get_many(symbols: list[str], as_of_date: str) -> dict[str, tuple]:
+    """
+    {symbol: (df, history_from)} for every symbol cached for as_of_date —
+    one connection and one query per 500 symbols.
+    """
+    found: dict[str, tuple] = {}
+    missing = []
+    for symbol in symbols:
+        entry = _frame_get(symbol, as_of_date)
+        if entry is None:
+            missing.append(symbol)
+        elif not entry[0].empty:
+            found[symbol] = entry
+    if not missing:
+        return found
+
+    _init_ohlcv_db()
+    try:
+        with sqlite3.connect(_DB_PATH) as conn:
+            for i in range(0, len(missing), _CACHE_BATCH):
+                chunk = missing[i : i + _CACHE_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT symbol, candles_json, history_from FROM ohlcv_cache "
+                    f"WHERE as_of_date=? AND symbol IN ({placeholders})",
+                    (as_of_date, *chunk),
+                ).fetchall()
+                for symbol, candles_json, history_from in rows:
+                    try:
+                        df = _cached_candles_to_df(candles_json)
+                    except Exception as e:
+                        log.warning(f"OHLCV cache read error for {symbol}: {e}")
+                        continue
+                    history_from = _history_from(history_from)
+                    _frame_put(symbol, as_of_date, df, history_from)
+                    if not df.empty:
+                        found[symbol] = (df, history_from)
+    except Exception as e:
+        log.warning(f"OHLCV bulk cache read error: {e}")
+    return found
+
+
+def _cache_set(
+    symbol: str, as_of_date: str, df: pd.DataFrame, history_from: date | None
+):
+    _frame_put(symbol, as_of_date, df, history_from)
     _init_ohlcv_db()
     try:
         df_reset = df.reset_index()
         df_reset["Date"] = df_reset["Date"].dt.strftime("%Y-%m-%dT%H:%M:%S")
-        candles = df_reset[["Date", "Open", "High", "Low", "Close", "Volume"]].values.tolist()
+        candles = df_reset[["Date", *_OHLCV_COLUMNS]].values.tolist()
         fetched_at = datetime.now(ZoneInfo("Asia/Kolkata")).isoformat()
         with sqlite3.connect(_DB_PATH) as conn:
             conn.execute(
-                "INSERT OR REPLACE INTO ohlcv_cache (symbol, as_of_date, fetched_at, candles_json) "
-                "VALUES (?, ?, ?, ?)",
-                (symbol, as_of_date, fetched_at, json.dumps(candles)),
+                "INSERT OR REPLACE INTO ohlcv_cache "
+                "(symbol, as_of_date, fetched_at, candles_json, history_from) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    symbol,
+                    as_of_date,
+                    fetched_at,
+                    json.dumps(candles),
+                    history_from and history_from.isoformat(),
+                ),
+            )
+            # Older snapshots are superseded — the new one carries their candles
+            conn.execute(
+                "DELETE FROM ohlcv_cache WHERE symbol=? AND as_of_date<?",
+                (symbol, as_of_date),
             )
             conn.commit()
     except Exception as e:
         log.warning(f"OHLCV cache write error for {symbol}: {e}")
 
-# ── Shared HTTP session with connection pooling ───────────────────────────────
-# Reuses TCP connections across threads — much faster than requests.get()
-_http = requests.Session()
-_http.mount(
-    "https://",
-    requests.adapters.HTTPAdapter(
-        pool_connections=20,
-        pool_maxsize=20,
-        max_retries=requests.adapters.Retry(
-            total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]
+
+# ── Shared HTTP/2 client with connection pooling ──────────────────────────────
+# One client for every thread: with HTTP/2 the concurrent candle fetches share a
+# handful of connections as separate streams, and the Authorization header is
+# HPACK-compressed after the first request instead of re-sent in full.
+# Scan workers are sized to the keep-alive pool so no thread waits for a socket.
+HTTP_POOL_SIZE = 20
+
+_http = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,  # connection errors only — status retries are in _http_get()
+        limits=httpx.Limits(
+            max_connections=50, max_keepalive_connections=HTTP_POOL_SIZE
         ),
     ),
+    headers={"Accept": "application/json"},
+    timeout=5.0,
+    follow_redirects=True,
 )
 
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.3  # seconds, doubled per attempt — same as urllib3's Retry
+_RETRY_AFTER_MAX = 30.0  # cap on a server-sent Retry-After
+
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying — the server's Retry-After if it sent one."""
+    try:
+        return min(float(resp.headers["Retry-After"]), _RETRY_AFTER_MAX)
+    except (KeyError, ValueError):
+        return _RETRY_BACKOFF * 2**attempt
+
+
+# ── Upstox rate limits ────────────────────────────────────────────────────────
+class TokenBucket:
+    """
+    Holds up to `capacity` tokens, refilled continuously at `rate` per second.
+    acquire_async() takes one token, sleeping only for the shortfall when empty,
+    so idle periods allow a burst and sustained load settles at `rate`.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.last_refill = monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return the seconds until one is due."""
+        with self._lock:
+            now = monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire_async(self) -> bool:
+        while wait := self._take():
+            await asyncio.sleep(wait)
+        return True
+
+
+class RateLimits:
+    """Every Upstox cap at once — a request needs a token from each bucket."""
+
+    def __init__(self, rates: tuple):
+        self.buckets = tuple(TokenBucket(cap, rate) for cap, rate in rates)
+
+    async def acquire_async(self):
+        for bucket in self.buckets:
+            await bucket.acquire_async()
+
+
+_SHARED_LIMITS_TIMEOUT = 0.25  # seconds per Redis call before going local
+_SHARED_LIMITS_BACKOFF = 30.0  # seconds on local buckets after a Redis failure
+
+
+class SharedRateLimits(RateLimits):
+    """
+    RateLimits whose state lives in Redis, so every gunicorn worker (and
+    instance) draws from one budget. A single Lua call per attempt refills all
+    buckets and takes a token only when each has one.
+
+    Redis is reached through redis.asyncio with short timeouts, so a slow or
+    unreachable server never stalls the fetch loop; after a failure the local
+    buckets take over for _SHARED_LIMITS_BACKOFF seconds.
+    """
+
+    _LUA = """
+    local now = tonumber(ARGV[#ARGV])
+    local tokens, wait = {}, 0
+    for i, key in ipairs(KEYS) do
+        local cap, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+        local state = redis.call('HMGET', key, 'tokens', 'ts')
+        local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+        local t = math.min(cap, (tonumber(state[1]) or cap) + elapsed * rate)
+        if t < 1 then wait = math.max(wait, (1 - t) / rate) end
+        tokens[i] = t
+    end
+    for i, key in ipairs(KEYS) do
+        local cap, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+        local t = tokens[i]
+        if wait == 0 then t = t - 1 end
+        redis.call('HSET', key, 'tokens', tostring(t), 'ts', tostring(now))
+        redis.call('EXPIRE', key, math.ceil(cap / rate) + 1)
+    end
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, rates: tuple):
+        super().__init__(rates)
+        self.url = url
+        self.keys = [f"upstox:rate:{cap}" for cap, _ in rates]
+        self.args = [value for pair in rates for value in pair]
+        self._script = None  # created on the fetch loop on first use
+        self._local_until = 0.0
+
+    def _shared_script(self):
+        if self._script is None:
+            client = aioredis.Redis.from_url(
+                self.url,
+                socket_timeout=_SHARED_LIMITS_TIMEOUT,
+                socket_connect_timeout=_SHARED_LIMITS_TIMEOUT,
+                retry=Retry(NoBackoff(), 0),  # fail fast — the local buckets cover it
+            )
+            self._script = client.register_script(self._LUA)
+        return self._script
+
+    async def acquire_async(self):
+        while monotonic() >= self._local_until:
+            try:
+                wait = float(
+                    await self._shared_script()(
+                        keys=self.keys, args=[*self.args, wall_time()]
+                    )
+                )
+            except (RedisError, OSError, asyncio.TimeoutError) as e:
+                log.warning(f"Shared rate limit unavailable, using local buckets: {e}")
+                self._local_until = monotonic() + _SHARED_LIMITS_BACKOFF
+                break
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+        await super().acquire_async()
+
+
+# 25 req/s (refilled at 22/s for headroom), 250 req/min, 1000 req/30min.
+_UPSTOX_RATES = ((25, 22), (250, 250 / 60), (1000, 1000 / 1800))
+
+
+def _make_limits() -> RateLimits:
+    """
+    Per-process buckets, or Redis-backed ones when the job store is shared —
+    that is when gunicorn runs several workers, and each would otherwise
+    spend the full Upstox budget on its own.
+    """
+    url = shared_store_url()
+    if url is None:
+        return RateLimits(_UPSTOX_RATES)
+    return SharedRateLimits(url, _UPSTOX_RATES)
+
+
+_UPSTOX_LIMITS = _make_limits()
+
+
+def _http_get(url: str, **kwargs) -> httpx.Response:
+    """
+    _http.get() that retries 429 and transient 5xx responses, waiting out the
+    server's Retry-After when given and backing off exponentially otherwise.
+    """
+    for attempt in range(_RETRY_TOTAL + 1):
+        resp = _http.get(url, **kwargs)
+        if resp.status_code not in _RETRY_STATUSES or attempt == _RETRY_TOTAL:
+            return resp
+        sleep(_retry_delay(resp, attempt))
+
+
+# ── Async fetch loop ──────────────────────────────────────────────────────────
+# Batch fetches run as coroutines on one daemon event-loop thread with its own
+# HTTP/2 AsyncClient; callers in any thread submit to it and block on the result.
+# Started on first use, so gunicorn workers each get theirs after the fork.
+_aio_loop: asyncio.AbstractEventLoop | None = None
+_aio_lock = threading.Lock()
+_aio_client: httpx.AsyncClient | None = None
+_aio_slots: asyncio.Semaphore | None = None
+
+
+def _aio_run(coro):
+    """Run coro on the shared fetch loop and wait for its result."""
+    global _aio_loop
+    if _aio_loop is None:
+        with _aio_lock:
+            if _aio_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="upstox-aio", daemon=True
+                ).start()
+                _aio_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _aio_loop).result()
+
+
+def _aio_state() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """Client and concurrency cap, created inside the loop on first use."""
+    global _aio_client, _aio_slots
+    if _aio_client is None:
+        _aio_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(
+                    max_connections=50, max_keepalive_connections=HTTP_POOL_SIZE
+                ),
+            ),
+            headers={"Accept": "application/json"},
+            timeout=5.0,
+        )
+        _aio_slots = asyncio.Semaphore(HTTP_POOL_SIZE)
+    return _aio_client, _aio_slots
+
+
+async def _http_get_async(url: str, **kwargs) -> httpx.Response:
+    """
+    Async _http_get() for Upstox API calls: takes a token from every rate-limit
+    bucket before each attempt, and retries 429/5xx the same way.
+    """
+    client, slots = _aio_state()
+    async with slots:
+        for attempt in range(_RETRY_TOTAL + 1):
+            await _UPSTOX_LIMITS.acquire_async()
+            resp = await client.get(url, **kwargs)
+            if resp.status_code not in _RETRY_STATUSES or attempt == _RETRY_TOTAL:
+                return resp
+            await asyncio.sleep(_retry_delay(resp, attempt))
+
+
+# ── Cached bearer token ───────────────────────────────────────────────────────
+# get_valid_token() re-reads config.json on every call; cache it so a scan does
+# one disk read instead of one per ticker. The short TTL still picks up a token
+# saved by another worker; a 401 drops the cache immediately.
+_TOKEN_TTL = 300  # seconds
+_token_cache: dict = {"token": None, "exp": 0.0}
+_token_lock = threading.Lock()
+
+
+def _cached_token() -> str:
+    with _token_lock:
+        if _token_cache["token"] and monotonic() < _token_cache["exp"]:
+            return _token_cache["token"]
+        token = get_valid_token()
+        _token_cache["token"] = token
+        _token_cache["exp"] = monotonic() + _TOKEN_TTL
+        return token
+
+
+def _invalidate_token():
+    with _token_lock:
+        _token_cache["exp"] = 0.0
+
+
 # ── Thread-safe instrument cache ──────────────────────────────────────────────
-_instrument_cache: dict = {}
-_master_df: pd.DataFrame = None
+# All lookups are dict gets — the master DataFrame is indexed once and dropped.
+_instrument_cache: dict = {}  # exact tradingsymbol → instrument_key
+_by_upper: dict = {}  # upper-cased tradingsymbol → instrument_key
+_by_clean: dict = {}  # upper-cased, "&"/"-"/whitespace stripped → instrument_key
+_clean_sorted: list = []  # (clean, tradingsymbol, instrument_key), sorted for bisect
 _cache_lock = threading.Lock()
 
+_CLEAN_RE = re.compile(r"[&\-\s]")
+
+
+def _clean_symbol(symbol: str) -> str:
+    return _CLEAN_RE.sub("", symbol.upper())
+
+
+_MASTER_URL = "https://assets.upstox.com/market-quote/instruments/exchange/NSE.csv.gz"
+_MASTER_PATH = os.path.join(tempfile.gettempdir(), "upstox_NSE.csv.gz")
+_MASTER_ETAG_PATH = f"{_MASTER_PATH}.etag"
+_MASTER_TTL = 24 * 60 * 60  # Upstox republishes the master at most daily
+
+
+def _master_csv_path() -> str:
+    """
+    Local copy of the instrument master. Once it is a day old, revalidate with
+    a conditional GET (ETag / Last-Modified) and only re-download on a 200.
+    A stale copy is still used if Upstox is unreachable.
+    """
+    try:
+        mtime = os.path.getmtime(_MASTER_PATH)
+    except OSError:
+        mtime = None
+    if mtime is not None:
+        age = datetime.now().timestamp() - mtime
+        if age < _MASTER_TTL:
+            log.info(f"Instrument master: using local copy ({age / 3600:.1f}h old)")
+            return _MASTER_PATH
+
+    headers = {}
+    if mtime is not None:
+        headers["If-Modified-Since"] = formatdate(mtime, usegmt=True)
+        try:
+            with open(_MASTER_ETAG_PATH) as f:
+                headers["If-None-Match"] = f.read().strip()
+        except OSError:
+            pass
+
+    try:
+        resp = _http_get(_MASTER_URL, headers=headers, timeout=15)
+        if resp.status_code == 304:
+            log.info("Instrument master: not modified upstream")
+            os.utime(_MASTER_PATH)  # restart the TTL
+            return _MASTER_PATH
+        resp.raise_for_status()
+    except Exception as e:
+        if mtime is None:
+            raise
+        log.warning(f"Instrument master refresh failed, using stale copy — {e}")
+        return _MASTER_PATH
+
+    tmp_path = f"{_MASTER_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(resp.content)
+    os.replace(tmp_path, _MASTER_PATH)  # atomic — other workers never see a partial file
+    etag = resp.headers.get("ETag")
+    if etag:
+        with open(_MASTER_ETAG_PATH, "w") as f:
+            f.write(etag)
+    return _MASTER_PATH
+
+
+_MASTER_COLUMNS = ["tradingsymbol", "instrument_key", "instrument_type"]
+
+
+def _read_equity_master(path: str) -> tuple[list[str], list[str]]:
+    """
+    (tradingsymbols, instrument_keys) of the EQUITY rows, in master order.
+    With pyarrow the multithreaded reader loads only the three columns and
+    filters in Arrow, so the full master is never materialised in pandas.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df = pd.read_csv(path, compression="gzip", usecols=_MASTER_COLUMNS)
+        df = df[df["instrument_type"] == "EQUITY"]
+        return df["tradingsymbol"].astype(str).tolist(), df["instrument_key"].tolist()
+
+    table = pacsv.read_csv(
+        path,  # .gz suffix → decompressed transparently
+        convert_options=pacsv.ConvertOptions(
+            include_columns=_MASTER_COLUMNS,
+            column_types={name: pa.string() for name in _MASTER_COLUMNS},
+        ),
+    )
+    table = table.filter(pc.equal(table["instrument_type"], "EQUITY"))
+    return table["tradingsymbol"].to_pylist(), table["instrument_key"].to_pylist()
+
 
 def _load_instrument_master():
     """
     Download Upstox NSE instrument master and cache it.
     Thread-safe double-checked locking — downloaded only once.
     """
-    global _instrument_cache, _master_df
+    global _instrument_cache, _by_upper, _by_clean, _clean_sorted
 
     if _instrument_cache:  # fast path
         return
@@ -128,25 +617,31 @@ def _load_instrument_master():
             return
 
         log.info("Loading Upstox instrument master...")
-        url = "https://assets.upstox.com/market-quote/instruments/exchange/NSE.csv.gz"
-        resp = _http.get(url, timeout=15)
-        resp.raise_for_status()
-
-        df = pd.read_csv(
-            io.BytesIO(resp.content),
-            compression="gzip",
-            usecols=["tradingsymbol", "instrument_key", "instrument_type"],
-        )
-        df = df[df["instrument_type"] == "EQUITY"].copy()
-        df["tradingsymbol_upper"] = df["tradingsymbol"].str.upper()
-
-        _master_df = df
-        _instrument_cache = dict(zip(df["tradingsymbol"], df["instrument_key"]))
+        symbols, keys = _read_equity_master(_master_csv_path())
+
+        # First row wins on collisions, as the old DataFrame filters did
+        by_upper: dict = {}
+        by_clean: dict = {}
+        clean_index: list = []
+        for sym, key in zip(symbols, keys):
+            clean = _clean_symbol(sym)
+            by_upper.setdefault(sym.upper(), key)
+            by_clean.setdefault(clean, key)
+            clean_index.append((clean, sym, key))
+
+        clean_index.sort()
+        _by_upper, _by_clean, _clean_sorted = by_upper, by_clean, clean_index
+        # Assigned last — a non-empty _instrument_cache marks the load complete
+        _instrument_cache = dict(zip(symbols, keys))
         log.info(f"Loaded {len(_instrument_cache)} NSE EQUITY instruments")
 
 
+@lru_cache(maxsize=4096)
 def _get_instrument_key(symbol: str) -> str:
-    """Return Upstox instrument key. Tries exact → uppercase → fuzzy."""
+    """
+    Return Upstox instrument key. Tries exact → uppercase → fuzzy.
+    Resolved keys are memoised per symbol; misses raise and are not cached.
+    """
     _load_instrument_master()
 
     # 1. Exact
@@ -154,110 +649,239 @@ def _get_instrument_key(symbol: str) -> str:
         return _instrument_cache[symbol]
 
     # 2. Case-insensitive
-    row = _master_df[_master_df["tradingsymbol_upper"] == symbol.upper()]
-    if not row.empty:
-        key = row.iloc[0]["instrument_key"]
-        with _cache_lock:
-            _instrument_cache[symbol] = key
+    key = _by_upper.get(symbol.upper())
+    if key is not None:
         return key
 
-    # 3. Fuzzy — strip punctuation and try prefix
-    clean = symbol.upper().replace("&", "").replace("-", "").replace(" ", "")
-    row = _master_df[
-        _master_df["tradingsymbol_upper"]
-        .str.replace(r"[&\-\s]", "", regex=True)
-        .str.startswith(clean, na=False)
-    ]
-    if not row.empty:
-        key = row.iloc[0]["instrument_key"]
-        actual = row.iloc[0]["tradingsymbol"]
-        with _cache_lock:
-            _instrument_cache[symbol] = key
-        log.info(f"{symbol}: fuzzy-matched to '{actual}'")
+    # 3. Fuzzy — strip punctuation, then exact match or prefix
+    clean = _clean_symbol(symbol)
+    key = _by_clean.get(clean)
+    actual = None
+    if key is None and clean:
+        # Every clean key starting with `clean` sorts at or after it, so the
+        # first entry from bisect_left is the shortest/smallest prefix match
+        i = bisect.bisect_left(_clean_sorted, (clean,))
+        if i < len(_clean_sorted) and _clean_sorted[i][0].startswith(clean):
+            _, actual, key = _clean_sorted[i]
+    if key is not None:
+        log.info(f"{symbol}: fuzzy-matched to '{actual or clean}'")
         return key
 
     raise ValueError(f"{symbol}: not found in Upstox instrument master")
 
 
-def fetch_ohlcv(symbol: str, period_days: int = 180) -> pd.DataFrame:
+def _latest_session_date() -> date:
+    """Today after the 15:30 IST close, otherwise yesterday."""
+    now_ist = datetime.now(ZoneInfo("Asia/Kolkata"))
+    if now_ist.time() >= time(15, 30):
+        return now_ist.date()
+    return (now_ist - timedelta(days=1)).date()
+
+
+_HISTORY_SLACK = timedelta(days=7)  # weekends + holidays before the first bar
+_CACHE_HISTORY_DAYS = 400  # kept per cached symbol — longest lookback (365) + slack
+
+
+def _covering(
+    df: pd.DataFrame | None, from_date: date, history_from: date | None = None
+) -> pd.DataFrame | None:
     """
-    Fetch daily OHLCV for one NSE symbol.
-    Checks SQLite cache first — only calls Upstox if data for today's as_of_date
-    is missing. Thread-safe — uses shared session with connection pooling.
+    Return df trimmed to [from_date, …] if it holds history back to from_date,
+    else None. The cache is shared by strategies with different lookbacks,
+    so a 180-day entry must not satisfy a 365-day request.
+
+    history_from is the start of the window the entry was fetched for: Upstox
+    returned every candle after it, so a stock listed since then is complete
+    even though its first bar is later than from_date. Entries written before
+    it was recorded fall back to checking the first bar.
     """
-    try:
-        now_ist = datetime.now(ZoneInfo("Asia/Kolkata"))
-        if now_ist.time() >= time(15, 30):
-            to_date = now_ist.date()
-        else:
-            to_date = (now_ist - timedelta(days=1)).date()
-
-        # ── Cache check ───────────────────────────────────────────────────────
-        as_of_date = to_date.strftime("%Y-%m-%d")
-        cached = _cache_get(symbol, as_of_date)
-        if cached is not None and not cached.empty:
-            log.debug(f"{symbol}: cache hit ({as_of_date})")
-            return cached
-
-        access_token = get_valid_token()
-        instrument_key = _get_instrument_key(symbol)
-
-        from_date = to_date - timedelta(days=period_days)
-
-        url = (
-            f"{BASE_URL}/historical-candle"
-            f"/{requests.utils.quote(instrument_key, safe='')}"
-            f"/day/{to_date.strftime('%Y-%m-%d')}/{from_date.strftime('%Y-%m-%d')}"
+    if df is None or df.empty:
+        return None
+    start = pd.Timestamp(from_date)
+    complete = history_from is not None and history_from <= from_date
+    if not complete and df.index[0] > start + _HISTORY_SLACK:
+        return None
+    return df[df.index >= start]
+
+
+def fetch_cached_batch(
+    symbols: list[str], period_days: int = 180
+) -> dict[str, pd.DataFrame]:
+    """
+    Return {symbol: DataFrame} for every symbol already in the OHLCV cache for
+    the latest session, in one SQLite round-trip. Upstox has no multi-symbol
+    historical-candle endpoint, so fetch_ohlcv_batch() requests each miss
+    separately on the async fetch loop.
+    """
+    to_date = _latest_session_date()
+    from_date = to_date - timedelta(days=period_days)
+    found = _cache_get_many(list(symbols), to_date.strftime("%Y-%m-%d"))
+    covered = {
+        sym: _covering(df, from_date, history_from)
+        for sym, (df, history_from) in found.items()
+    }
+    return {sym: df for sym, df in covered.items() if df is not None}
+
+
+def _candles_url(symbol: str, from_date: date, to_date: date) -> str:
+    instrument_key = _get_instrument_key(symbol)
+    return (
+        f"{BASE_URL}/historical-candle"
+        f"/{quote(instrument_key, safe='')}"
+        f"/day/{to_date.strftime('%Y-%m-%d')}/{from_date.strftime('%Y-%m-%d')}"
+    )
+
+
+def _candles_from(resp: httpx.Response) -> list:
+    if resp.status_code == 401:
+        raise EnvironmentError(
+            "Upstox token rejected. Re-authenticate via the scanner UI."
         )
+    resp.raise_for_status()
+    return resp.json().get("data", {}).get("candles", [])
+
 
-        resp = _http.get(
-            url,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Accept": "application/json",
-            },
-            timeout=5,
+async def _fetch_candles_async(url: str) -> list:
+    resp = await _http_get_async(
+        url, headers={"Authorization": f"Bearer {_cached_token()}"}
+    )
+    if resp.status_code == 401:
+        _invalidate_token()
+        resp = await _http_get_async(
+            url, headers={"Authorization": f"Bearer {_cached_token()}"}
         )
+    return _candles_from(resp)
 
-        if resp.status_code == 401:
-            raise EnvironmentError(
-                "Upstox token rejected. Re-authenticate via the scanner UI."
-            )
 
-        resp.raise_for_status()
-        candles = resp.json().get("data", {}).get("candles", [])
+async def _fetch_candles_many(urls: dict) -> dict[str, list | BaseException]:
+    """{symbol: candles} for every url at once — failures come back as exceptions."""
+    results = await asyncio.gather(
+        *(_fetch_candles_async(url) for url in urls.values()), return_exceptions=True
+    )
+    return dict(zip(urls, results))
 
-        if not candles:
-            log.warning(f"{symbol}: no candles returned")
-            return pd.DataFrame()
 
-        df = pd.DataFrame(
-            candles, columns=["Date", "Open", "High", "Low", "Close", "Volume", "OI"]
-        )
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.set_index("Date").sort_index()
-        df = df[["Open", "High", "Low", "Close", "Volume"]]
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df = df.dropna(how="all")
-
-        log.info(f"{symbol}: {len(df)} rows (fetched from Upstox)")
-        _cache_set(symbol, as_of_date, df)
-        return df
-
-    except EnvironmentError:
-        raise
-    except ValueError as e:
+def _fetch_window(period_days: int) -> tuple[date, date, str]:
+    """(from_date, to_date, as_of_date) for a fetch of period_days."""
+    to_date = _latest_session_date()
+    return to_date - timedelta(days=period_days), to_date, to_date.strftime("%Y-%m-%d")
+
+
+def _delta_base(symbol: str, from_date: date) -> tuple[tuple | None, date]:
+    """
+    Latest older cache entry as (df, history_from), if it covers the window,
+    and the date to fetch from. The frame comes back untrimmed so the merge
+    keeps all its history.
+    """
+    df, history_from = _cache_get_latest(symbol)
+    if _covering(df, from_date, history_from) is None:
+        return None, from_date
+    return (df, history_from), df.index[-1].date() + timedelta(days=1)
+
+
+def _fetch_failed(symbol: str, e: Exception) -> pd.DataFrame:
+    if isinstance(e, EnvironmentError):
+        raise e
+    if isinstance(e, ValueError):
         log.warning(str(e))
-        return pd.DataFrame()
-    except Exception as e:
+    else:
         log.error(f"{symbol}: fetch error — {e}")
+    return pd.DataFrame()
+
+
+def fetch_ohlcv_batch(
+    symbols: list[str], period_days: int = 180
+) -> dict[str, pd.DataFrame]:
+    """
+    Return {symbol: DataFrame} for a group of symbols. Upstox's historical-candle
+    endpoint takes one instrument per request, so this is the batching available:
+    one SQLite query for every cached symbol, then every miss requested at once
+    on the async fetch loop. Symbols with no data map to an empty DataFrame.
+    """
+    frames = fetch_cached_batch(symbols, period_days)
+    misses = [sym for sym in symbols if sym not in frames]
+    if not misses:
+        return frames
+
+    from_date, to_date, as_of_date = _fetch_window(period_days)
+    bases, urls = {}, {}
+    for sym in misses:
+        try:
+            base, fetch_from = _delta_base(sym, from_date)
+            if fetch_from <= to_date:
+                urls[sym] = _candles_url(sym, fetch_from, to_date)
+            bases[sym] = base
+        except Exception as e:
+            frames[sym] = _fetch_failed(sym, e)
+
+    fetched = _aio_run(_fetch_candles_many(urls)) if urls else {}
+    for sym, base in bases.items():
+        candles = fetched.get(sym, [])
+        try:
+            if isinstance(candles, BaseException):
+                raise candles
+            frames[sym] = _merge_candles(sym, base, candles, from_date, as_of_date)
+        except Exception as e:
+            frames[sym] = _fetch_failed(sym, e)
+    return frames
+
+
+def _merge_candles(
+    symbol: str,
+    base: tuple | None,
+    candles: list,
+    from_date: date,
+    as_of_date: str,
+) -> pd.DataFrame:
+    """
+    Append fetched candles to the cached base and write the merged history
+    back; only the frame returned to the caller is trimmed to from_date.
+    Persisting the trimmed frame would let a 180-day scan shrink the entry a
+    365-day scan delta-fetches on top of, forcing full re-downloads.
+
+    base is (df, history_from) from _delta_base(); without one, candles were
+    fetched for the whole window, so the history is complete from from_date.
+    """
+    fresh = _rows_to_df(candles) if candles else None
+
+    if base is None and fresh is None:
+        log.warning(f"{symbol}: no candles returned")
         return pd.DataFrame()
 
+    if base is None:
+        df, history_from = fresh, from_date
+    else:
+        df, history_from = base
+        history_from = history_from or df.index[0].date()  # entry predates the column
+        if fresh is not None:
+            df = pd.concat([df, fresh])
+            df = df[~df.index.duplicated(keep="last")]
+    # Keep every lookback a strategy can ask for, but don't grow without bound
+    keep_from = min(
+        from_date, date.fromisoformat(as_of_date) - timedelta(days=_CACHE_HISTORY_DAYS)
+    )
+    df = df[df.index >= pd.Timestamp(keep_from)]
+    _cache_set(symbol, as_of_date, df, max(history_from, keep_from))
 
-def preload_instruments():
-    """Pre-load instrument master at Flask startup so first scan is instant."""
+    df = df[df.index >= pd.Timestamp(from_date)]
+    log.info(
+        f"{symbol}: {len(df)} rows "
+        f"({len(candles)} fetched from Upstox{', delta' if base is not None else ''})"
+    )
+    return df
+
+
+def preload_instruments(symbols=None):
+    """
+    Pre-load instrument master at Flask startup so first scan is instant.
+    If symbols are given, resolve each one too so scans hit the key cache.
+    """
     _load_instrument_master()
+    for symbol in symbols or ():
+        try:
+            _get_instrument_key(symbol)
+        except ValueError:
+            pass  # logged again, with context, when a scan fetches it
 
 
 def exchange_code_for_token(code: str) -> str:
@@ -272,9 +896,8 @@ def exchange_code_for_token(code: str) -> str:
             "must all be set in backend/.env"
         )
 
-    resp = requests.post(
+    resp = _http.post(
         f"{BASE_URL}/login/authorization/token",
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
         data={
             "code": code,
             "client_id": api_key,
@@ -282,10 +905,9 @@ def exchange_code_for_token(code: str) -> str:
             "redirect_uri": redirect,
             "grant_type": "authorization_code",
         },
-        timeout=5,
     )
 
-    if not resp.ok:
+    if not resp.is_success:
         raise RuntimeError(f"Token exchange failed ({resp.status_code}): {resp.text}")
 
     access_token = resp.json().get("access_token")
@@ -293,5 +915,6 @@ def exchange_code_for_token(code: str) -> str:
         raise RuntimeError("No access_token in Upstox response")
 
     save_token(access_token)
+    _invalidate_token()
     log.info("Upstox access token saved")
     return access_token
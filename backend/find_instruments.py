@@ -4,43 +4,49 @@ Run: python find_instruments.py
 """
 
 import io
+import csv
+import gzip
 import requests
-import pandas as pd
+from collections import Counter
 from universe import get_universe, get_universe_names
 
 print("Downloading Upstox instrument master...")
 url = "https://assets.upstox.com/market-quote/instruments/exchange/NSE.csv.gz"
 resp = requests.get(url, timeout=30)
-df = pd.read_csv(io.BytesIO(resp.content), compression="gzip")
 
-print(f"\nTotal rows: {len(df)}")
-print(f"Columns: {df.columns.tolist()}")
+# Single streaming pass with the csv module — no pandas needed
+WATCH = ("RELIANCE", "WIPRO", "TCS")
+type_counts: Counter = Counter()
+samples: dict[str, list[str]] = {}
+watched: dict[str, list[dict]] = {sym: [] for sym in WATCH}
+with gzip.open(io.BytesIO(resp.content), "rt", newline="") as f:
+    reader = csv.DictReader(f)
+    columns = reader.fieldnames
+    for row in reader:
+        itype = row["instrument_type"]
+        type_counts[itype] += 1
+        sample = samples.setdefault(itype, [])
+        if len(sample) < 5:
+            sample.append(row["tradingsymbol"])
+        if row["tradingsymbol"] in watched:
+            watched[row["tradingsymbol"]].append(row)
+
+print(f"\nTotal rows: {sum(type_counts.values())}")
+print(f"Columns: {columns}")
 print(f"\nAll instrument_type values and counts:")
-print(df["instrument_type"].value_counts().to_string())
+for itype, count in type_counts.most_common():
+    print(f"{itype:<20} {count}")
 
 print(f"\nSample rows for each instrument_type:")
-for itype in df["instrument_type"].unique():
-    sample = df[df["instrument_type"] == itype]["tradingsymbol"].head(5).tolist()
+for itype, sample in samples.items():
     print(f"  {itype}: {sample}")
 
-# Try finding RELIANCE regardless of type
-print(f"\n--- RELIANCE in ALL types ---")
-print(
-    df[df["tradingsymbol"] == "RELIANCE"][
-        ["tradingsymbol", "instrument_type", "instrument_key"]
-    ].to_string()
-)
-
-print(f"\n--- WIPRO in ALL types ---")
-print(
-    df[df["tradingsymbol"] == "WIPRO"][
-        ["tradingsymbol", "instrument_type", "instrument_key"]
-    ].to_string()
-)
-
-print(f"\n--- TCS in ALL types ---")
-print(
-    df[df["tradingsymbol"] == "TCS"][
-        ["tradingsymbol", "instrument_type", "instrument_key"]
-    ].to_string()
-)
+# Try finding each watched symbol regardless of type
+for sym in WATCH:
+    print(f"\n--- {sym} in ALL types ---")
+    print(f"{'tradingsymbol':<20} {'instrument_type':<16} instrument_key")
+    for row in watched[sym]:
+        print(
+            f"{row['tradingsymbol']:<20} {row['instrument_type']:<16} "
+            f"{row['instrument_key']}"
+        )
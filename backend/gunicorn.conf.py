@@ -1,11 +1,29 @@
 import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
-workers = 1
-worker_class = "gthread"  # threaded sync worker — no gevent, no recursion issues
-threads = 4  # handles concurrent SSE + API requests
+# Scan jobs live in process memory unless SCAN_STORE_URL points at Redis, so
+# more than one worker is only safe once every worker can see every job. Same
+# scheme check as settings.shared_store_url() — keep the two in sync.
+_shared_store = os.environ.get("SCAN_STORE_URL", "").strip().startswith(
+    ("redis://", "rediss://", "unix://")
+)
+workers = max(2, os.cpu_count() or 1) if _shared_store else 1
+# Scans are polled (short requests), not streamed, so a thread is only held for
+# one status read. gthread by default — no gevent, no recursion issues. Set
+# GUNICORN_WORKER_CLASS=gevent (and pip install gevent) for many idle clients.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))  # gthread only
+worker_connections = 100  # gevent/eventlet only
 timeout = 120
 keepalive = 5
 accesslog = "-"
 errorlog = "-"
 loglevel = "info"
+
+
+def post_worker_init(worker):
+    # Warm caches in each worker — app.py skips this at import so the scan
+    # process pool's spawned children don't repeat it.
+    from app import start_background_warmup
+
+    start_background_warmup()
@@ -1,5 +1,5 @@
 """
-scan_store.py — In-memory store for async scan jobs.
+scan_store.py — Store for async scan jobs.
 
 Instead of SSE (which Render's proxy kills after 90s), the frontend
 polls GET /api/scan/status/<job_id> every second.
@@ -8,71 +8,277 @@ Flow:
   1. POST /api/scan/start  → returns { job_id }  immediately
   2. Background thread runs the scan, updates job state
   3. Frontend polls GET /api/scan/status/<job_id> every second
-  4. Each poll returns { status, progress, results_so_far }
+  4. Each poll returns { status, progress, matches, last_seq }
   5. When status == "done", frontend stops polling
+
+Every match carries a 1-based "seq". Polling with ?since=<last_seq> returns
+only matches with seq > since, so each poll costs O(new matches) instead of
+re-sending the whole list every second.
+
+Backends:
+  - memory (default): a dict in this process — requires a single gunicorn worker
+  - redis: set SCAN_STORE_URL=redis://… so every worker/instance sees every job
 """
 
+import os
 import uuid
+import itertools
 import threading
 import time
 import logging
+from collections import deque
+from typing import Protocol
+
+import orjson
+import redis
+
+from settings import shared_store_url
 
 log = logging.getLogger(__name__)
 
-# { job_id: { status, total, completed, matches, error } }
-_jobs: dict = {}
-_lock = threading.Lock()
+JOB_TTL = 600  # seconds — jobs are dropped 10 minutes after creation
 
 
-def create_job() -> str:
-    job_id = str(uuid.uuid4())[:8]
-    with _lock:
-        _jobs[job_id] = {
-            "status": "running",
-            "total": 0,
-            "completed": 0,
-            "matches": [],
-            "error": None,
-            "created_at": time.time(),
+def _new_job_id() -> str:
+    return str(uuid.uuid4())[:8]
+
+
+def _with_seq(matches: list, since: int) -> list[dict]:
+    return [{**m, "seq": since + i} for i, m in enumerate(matches, start=1)]
+
+
+class JobStore(Protocol):
+    def create_job(self) -> str: ...
+    def get_job(self, job_id: str, since: int = 0) -> dict | None: ...
+    def get_job_version(self, job_id: str) -> int | None: ...
+    def update_progress(self, job_id: str, completed: int, total: int): ...
+    def add_match(self, job_id: str, result: dict): ...
+    def finish_job(self, job_id: str): ...
+    def fail_job(self, job_id: str, error: str): ...
+    def cleanup_old_jobs(self): ...
+
+
+class MemoryJobStore:
+    """
+    { job_id: { status, total, completed, matches, error, version } }
+
+    version is bumped on every write so readers can reuse a serialised snapshot.
+
+    _lock only guards the dict's shape (create / cleanup / snapshot). Each job
+    has a single writer — its scan thread — and per-job writes are GIL-atomic
+    item assignments or deque.append, so the per-ticker hot path takes no lock.
+    """
+
+    def __init__(self):
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+
+    def create_job(self) -> str:
+        job_id = _new_job_id()
+        with self._lock:
+            self._jobs[job_id] = {
+                "status": "running",
+                "total": 0,
+                "completed": 0,
+                "matches": deque(),
+                "error": None,
+                "created_at": time.time(),
+                "version": 0,
+            }
+        return job_id
+
+    def get_job(self, job_id: str, since: int = 0) -> dict | None:
+        with self._lock:
+            job = dict(self._jobs.get(job_id, {}))
+        if job:
+            # islice over a deque runs in C without releasing the GIL — a safe copy
+            matches = list(itertools.islice(job["matches"], since, None))
+            job["last_seq"] = since + len(matches)
+            job["matches"] = _with_seq(matches, since)
+        return job
+
+    def get_job_version(self, job_id: str) -> int | None:
+        job = self._jobs.get(job_id)
+        return None if job is None else job["version"]
+
+    def update_progress(self, job_id: str, completed: int, total: int):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job["completed"] = completed
+            job["total"] = total
+            job["version"] += 1
+
+    def add_match(self, job_id: str, result: dict):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job["matches"].append(result)
+            job["version"] += 1
+
+    def finish_job(self, job_id: str):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job["status"] = "done"
+            job["version"] += 1
+
+    def fail_job(self, job_id: str, error: str):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job["error"] = error
+            job["status"] = "error"
+            job["version"] += 1
+
+    def cleanup_old_jobs(self):
+        """Remove jobs older than JOB_TTL to free memory."""
+        cutoff = time.time() - JOB_TTL
+        with self._lock:
+            old = [jid for jid, j in self._jobs.items() if j["created_at"] < cutoff]
+            for jid in old:
+                del self._jobs[jid]
+
+
+# Updates run as scripts: the existence check and the write are one atomic
+# round-trip, so a key that expires mid-update is never recreated without a TTL.
+_WRITE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+return 1
+"""
+
+_ADD_MATCH_LUA = """
+local ttl = redis.call('TTL', KEYS[1])
+if ttl <= 0 then return 0 end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+return 1
+"""
+
+
+class RedisJobStore:
+    """
+    job:{id}          HASH  status / total / completed / error / created_at / version
+    job:{id}:matches  LIST  one orjson-encoded match per entry, in arrival order
+
+    Keys expire JOB_TTL after creation, so cleanup is Redis' job.
+    """
+
+    def __init__(self, url: str):
+        self._r = redis.Redis.from_url(url)
+        self._write_script = self._r.register_script(_WRITE_LUA)
+        self._add_match_script = self._r.register_script(_ADD_MATCH_LUA)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def create_job(self) -> str:
+        job_id = _new_job_id()
+        key = self._key(job_id)
+        with self._r.pipeline() as p:
+            p.hset(
+                key,
+                mapping={
+                    "status": "running",
+                    "total": 0,
+                    "completed": 0,
+                    "error": "",
+                    "created_at": time.time(),
+                    "version": 0,
+                },
+            )
+            p.expire(key, JOB_TTL)
+            p.execute()
+        return job_id
+
+    def get_job(self, job_id: str, since: int = 0) -> dict | None:
+        key = self._key(job_id)
+        with self._r.pipeline() as p:
+            p.hgetall(key)
+            p.lrange(f"{key}:matches", since, -1)
+            fields, matches = p.execute()
+        if not fields:
+            return {}
+        fields = {k.decode(): v.decode() for k, v in fields.items()}
+        return {
+            "status": fields["status"],
+            "total": int(fields["total"]),
+            "completed": int(fields["completed"]),
+            "matches": _with_seq([orjson.loads(m) for m in matches], since),
+            "last_seq": since + len(matches),
+            "error": fields["error"] or None,
+            "created_at": float(fields["created_at"]),
+            "version": int(fields["version"]),
         }
-    return job_id
+
+    def get_job_version(self, job_id: str) -> int | None:
+        version = self._r.hget(self._key(job_id), "version")
+        return None if version is None else int(version)
+
+    def _write(self, job_id: str, **fields):
+        args = [item for pair in fields.items() for item in pair]
+        self._write_script(keys=[self._key(job_id)], args=args)
+
+    def update_progress(self, job_id: str, completed: int, total: int):
+        self._write(job_id, completed=completed, total=total)
+
+    def add_match(self, job_id: str, result: dict):
+        key = self._key(job_id)
+        self._add_match_script(
+            keys=[key, f"{key}:matches"],
+            args=[orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)],
+        )
+
+    def finish_job(self, job_id: str):
+        self._write(job_id, status="done")
+
+    def fail_job(self, job_id: str, error: str):
+        self._write(job_id, status="error", error=error)
+
+    def cleanup_old_jobs(self):
+        pass  # keys carry their own TTL
+
+
+def _make_store() -> JobStore:
+    url = shared_store_url()
+    if url is not None:
+        log.info("Scan jobs stored in Redis")
+        return RedisJobStore(url)
+    if os.environ.get("SCAN_STORE_URL", "").strip():
+        log.warning("Unsupported SCAN_STORE_URL scheme, using memory")
+    return MemoryJobStore()
+
+
+_store: JobStore = _make_store()
+
+
+def create_job() -> str:
+    return _store.create_job()
+
+
+def get_job(job_id: str, since: int = 0) -> dict | None:
+    return _store.get_job(job_id, since)
 
 
-def get_job(job_id: str) -> dict | None:
-    with _lock:
-        return dict(_jobs.get(job_id, {}))
+def get_job_version(job_id: str) -> int | None:
+    return _store.get_job_version(job_id)
 
 
 def update_progress(job_id: str, completed: int, total: int):
-    with _lock:
-        if job_id in _jobs:
-            _jobs[job_id]["completed"] = completed
-            _jobs[job_id]["total"] = total
+    _store.update_progress(job_id, completed, total)
 
 
 def add_match(job_id: str, result: dict):
-    with _lock:
-        if job_id in _jobs:
-            _jobs[job_id]["matches"].append(result)
+    _store.add_match(job_id, result)
 
 
 def finish_job(job_id: str):
-    with _lock:
-        if job_id in _jobs:
-            _jobs[job_id]["status"] = "done"
+    _store.finish_job(job_id)
 
 
 def fail_job(job_id: str, error: str):
-    with _lock:
-        if job_id in _jobs:
-            _jobs[job_id]["status"] = "error"
-            _jobs[job_id]["error"] = error
+    _store.fail_job(job_id, error)
 
 
 def cleanup_old_jobs():
-    """Remove jobs older than 10 minutes to free memory."""
-    cutoff = time.time() - 600
-    with _lock:
-        old = [jid for jid, j in _jobs.items() if j["created_at"] < cutoff]
-        for jid in old:
-            del _jobs[jid]
+    _store.cleanup_old_jobs()
@@ -0,0 +1,19 @@
+"""
+settings.py — Environment settings read by more than one module.
+
+Kept free of imports from the rest of the backend, so the job store and the
+Upstox HTTP layer can both consult it without depending on each other.
+"""
+
+import os
+
+_SHARED_STORE_SCHEMES = ("redis://", "rediss://", "unix://")  # gunicorn.conf.py too
+
+
+def shared_store_url() -> str | None:
+    """
+    SCAN_STORE_URL when it points at Redis — the store every worker shares —
+    else None. An unsupported scheme counts as unset.
+    """
+    url = os.environ.get("SCAN_STORE_URL", "").strip()
+    return url if url.startswith(_SHARED_STORE_SCHEMES) else None
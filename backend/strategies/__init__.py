@@ -1,5 +1,6 @@
 """Strategy registry — import and register all strategies here."""
 
+import numpy as np
 from .rsi_oversold import RSIOversoldStrategy
 from .macd_crossover import MACDCrossoverStrategy
 from .golden_cross import GoldenCrossStrategy
@@ -8,6 +9,9 @@ from .volume_surge import VolumeSurgeStrategy
 from .ema_pullback import EMAPullbackStrategy
 from .everest import EverestStrategy
 from .sma34_pullback import SMA34PullbackStrategy
+from .indicators import emas_last, macd_last
+from .rsi_oversold import _rsi_last
+from .everest import _st_core
 
 STRATEGIES: dict = {
     s.name: s
@@ -30,3 +34,15 @@ def get_strategy(name: str):
 
 def get_strategy_list() -> list[dict]:
     return [{"name": s.name, "description": s.description} for s in STRATEGIES.values()]
+
+
+def warm_kernels():
+    """
+    Compile (or load from the on-disk cache) every Numba kernel once, with the
+    argument types scans use, so the first live scan doesn't pay the JIT.
+    """
+    x = np.linspace(100.0, 120.0, 80)
+    emas_last(x, np.array([20, 50]), 5)
+    macd_last(x, 12, 26, 9, 5)
+    _rsi_last(x, 14)
+    _st_core(x + 1.0, x - 1.0, x, 7, 3.0, 65)
@@ -0,0 +1,13 @@
+"""
+Numba shim — `njit` compiles when numba is installed, and is a no-op
+decorator otherwise so the scanner still runs (just slower) without it.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on environment
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
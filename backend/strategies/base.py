@@ -1,23 +1,71 @@
 """
 BaseStrategy — concurrent scanning engine.
 
-Upstox limits: 25 req/sec, 250 req/min, 1000 req/30min.
+Upstox limits: 25 req/sec, 250 req/min, 1000 req/30min — enforced by token
+buckets in data_provider, so workers never need to pace themselves.
 
-With the SQLite OHLCV cache in data_provider, most scans hit local disk and
-complete in milliseconds — no Upstox calls needed after the first run each day.
-On a cold cache, 20 workers naturally throttle to ~13 req/s (well under 25/s
-limit), so no artificial stagger is needed.
+Symbols are fetched in batches of FETCH_BATCH_SIZE via fetch_ohlcv_batch():
+one SQLite query per batch for cached symbols, misses fetched concurrently on
+data_provider's asyncio loop (at most HTTP_POOL_SIZE Upstox calls in flight).
+Each finished batch is then scanned — a pure-CPU step with no I/O left in it.
+
+Set SCAN_PROCESSES=N (N >= 2) on multi-core hosts to run the CPU-bound
+scan() step in a process pool, outside the GIL.
 """
 
+import os
+import re
+import queue
 import logging
+import threading
+import multiprocessing
+import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from data_provider import fetch_ohlcv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from data_provider import fetch_ohlcv_batch
 
 log = logging.getLogger(__name__)
 
-MAX_WORKERS = 20  # concurrent threads
+FETCH_BATCH_SIZE = 50  # symbols per fetch_ohlcv_batch() call
+FETCH_BATCHES = 4  # batches in flight at once — keeps the Upstox pool saturated
+SCAN_PROCESSES = int(os.environ.get("SCAN_PROCESSES", "0"))  # 0/1 = in-thread
+
+_TICKER_RE = re.compile(r"\.(?:NS|BO)$")  # exchange suffix, e.g. "RELIANCE.NS"
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    from . import warm_kernels  # deferred — the package imports this module
+
+    warm_kernels()
+
+
+def _get_process_pool() -> ProcessPoolExecutor | None:
+    """Lazily start the shared scan process pool (None when disabled)."""
+    global _process_pool
+    if SCAN_PROCESSES < 2:
+        return None
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # spawn, not fork — the parent is multi-threaded
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=SCAN_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+                log.info(f"Scan process pool started — {SCAN_PROCESSES} processes")
+    return _process_pool
+
+
+def _scan_one(strategy_name: str, symbol: str, data: pd.DataFrame) -> dict | None:
+    """Process-pool entry point. Strategies are looked up by name, not pickled."""
+    from strategies import get_strategy
+
+    return get_strategy(strategy_name)._scan_frame(symbol, data)
 
 
 class BaseStrategy(ABC):
@@ -29,15 +77,28 @@ class BaseStrategy(ABC):
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
         pass
 
-    def _fetch_and_scan(self, symbol: str) -> tuple[str, dict | None]:
+    def _scan_frame(self, symbol: str, df: pd.DataFrame | None) -> dict | None:
         try:
-            df = fetch_ohlcv(symbol, period_days=self._period_days)
-            if df.empty or len(df) < 30:
-                return symbol, None
-            return symbol, self.scan(symbol, df)
+            if df is None or df.empty or len(df) < 30:
+                return None
+            return self.scan(symbol, df)
         except Exception as e:
             log.warning(f"{symbol}: {e}")
-            return symbol, None
+            return None
+
+    def _scan_batch(self, symbols: list, frames: dict):
+        """Yield (symbol, result) for one fetched batch, in symbol order."""
+        pool = _get_process_pool()
+        if pool is None:
+            for sym in symbols:
+                yield sym, self._scan_frame(sym, frames.get(sym))
+            return
+        futures = [
+            (sym, pool.submit(_scan_one, self.name, sym, frames.get(sym)))
+            for sym in symbols
+        ]
+        for sym, future in futures:
+            yield sym, future.result()
 
     def run(self, tickers: list) -> list:
         return list(self.run_stream(tickers))
@@ -45,22 +106,53 @@ class BaseStrategy(ABC):
     def run_stream(self, tickers: list):
         """
         Yields progress/match events as stocks complete.
-        No stagger needed — OHLCV cache handles rate limiting naturally.
+        Batches are fetched in the background and scanned as each one lands.
+        At most FETCH_BATCHES are in flight: the next is submitted only as one
+        completes, so fetching never runs far ahead of the consumer and an
+        abandoned scan stops after the batches already in flight.
+
+        Finished fetches are pushed onto a queue by the worker itself, so the
+        generator wakes exactly once per landed batch.
         """
-        symbols = [t.replace(".NS", "").replace(".BO", "") for t in tickers]
+        symbols = [_TICKER_RE.sub("", t) for t in tickers]
         total = len(symbols)
         completed = 0
 
-        log.info(f"Scanning {total} stocks — {MAX_WORKERS} workers")
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(self._fetch_and_scan, sym): sym for sym in symbols}
-
-            for future in as_completed(futures):
-                sym = futures[future]
-                completed += 1
+        batches = [
+            symbols[i : i + FETCH_BATCH_SIZE]
+            for i in range(0, total, FETCH_BATCH_SIZE)
+        ]
+        log.info(f"Scanning {total} stocks in {len(batches)} batches")
+
+        pending = iter(batches)
+        landed: queue.Queue = queue.Queue()
+        in_flight = 0
+
+        with ThreadPoolExecutor(max_workers=FETCH_BATCHES) as executor:
+
+            def submit_next() -> int:
+                batch = next(pending, None)
+                if batch is None:
+                    return 0
+                future = executor.submit(fetch_ohlcv_batch, batch, self._period_days)
+                future.add_done_callback(lambda f, b=batch: landed.put((b, f)))
+                return 1
+
+            for _ in range(FETCH_BATCHES):
+                in_flight += submit_next()
+
+            while in_flight:
+                batch, future = landed.get()
+                in_flight -= 1
+                in_flight += submit_next()  # refill first: fetch overlaps the scan
                 try:
-                    _, result = future.result()
+                    frames = future.result()
+                except Exception as e:
+                    log.warning(f"Batch fetch failed ({batch[0]}…): {e}")
+                    frames = {}
+
+                for sym, result in self._scan_batch(batch, frames):
+                    completed += 1
                     if result:
                         yield {
                             "type": "match",
@@ -75,20 +167,12 @@ class BaseStrategy(ABC):
                             "total": total,
                             "symbol": sym,
                         }
-                except Exception as e:
-                    log.warning(f"{sym}: {e}")
-                    yield {
-                        "type": "progress",
-                        "completed": completed,
-                        "total": total,
-                        "symbol": sym,
-                    }
 
     @staticmethod
-    def _price_change(close: pd.Series) -> float:
-        p, pp = float(close.iloc[-1]), float(close.iloc[-2])
+    def _price_change(close: np.ndarray) -> float:
+        p, pp = float(close[-1]), float(close[-2])
         return round(((p - pp) / pp) * 100, 2)
 
     @staticmethod
     def _clean(ticker: str) -> str:
-        return ticker.replace(".NS", "").replace(".BO", "")
+        return _TICKER_RE.sub("", ticker)
@@ -1,5 +1,6 @@
 """52-Week High Breakout — price within 2% of 52-week high."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
 
@@ -15,17 +16,17 @@ class BreakoutStrategy(BaseStrategy):
         self.threshold_pct = threshold_pct
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
-        high = data["High"].squeeze()
-        volume = data["Volume"].squeeze()
+        close = data["Close"].to_numpy(dtype=np.float64)
+        high = data["High"].to_numpy(dtype=np.float64)
+        volume = data["Volume"].to_numpy(dtype=np.float64)
         if len(close) < 50:
             return None
 
-        w52_high = float(high.iloc[:-1].max())
-        price = float(close.iloc[-1])
+        w52_high = float(high[:-1].max())
+        price = float(close[-1])
         dist_pct = round(((w52_high - price) / w52_high) * 100, 2)
-        avg_vol = float(volume.iloc[-21:-1].mean())
-        cur_vol = float(volume.iloc[-1])
+        avg_vol = float(volume[-21:-1].mean())
+        cur_vol = float(volume[-1])
         vol_ratio = round(cur_vol / avg_vol, 2) if avg_vol > 0 else 0
 
         if dist_pct <= self.threshold_pct:
@@ -1,7 +1,11 @@
 """EMA Pullback — uptrending stock pulling back to touch 20 EMA."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
+from .indicators import emas_last
+
+_SPANS = np.array([20, 50])
 
 
 class EMAPullbackStrategy(BaseStrategy):
@@ -12,16 +16,14 @@ class EMAPullbackStrategy(BaseStrategy):
         self.tolerance_pct = tolerance_pct
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
-        if len(close) < 55:
+        if len(data) < 55:
             return None
 
-        ema20 = close.ewm(span=20, adjust=False).mean()
-        ema50 = close.ewm(span=50, adjust=False).mean()
-
-        price = float(close.iloc[-1])
-        e20 = float(ema20.iloc[-1])
-        e50 = float(ema50.iloc[-1])
+        close = data["Close"].to_numpy(dtype=np.float64)
+        ema_tails = emas_last(close, _SPANS, 1)  # 20 and 50 EMA in one pass
+        price = float(close[-1])
+        e20 = float(ema_tails[0, -1])
+        e50 = float(ema_tails[1, -1])
 
         in_uptrend = price > e50 and e20 > e50
         dist_from_e20 = round(((price - e20) / e20) * 100, 2)
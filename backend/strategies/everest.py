@@ -14,81 +14,94 @@ Supertrend calculation:
   - Green means : close > supertrend line (bullish)
 """
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
-
-
-def _supertrend(
-    df: pd.DataFrame, period: int = 7, multiplier: float = 3.0
-) -> tuple[pd.Series, pd.Series]:
+from ._njit import njit
+
+
+@njit(cache=True, nogil=True)
+def _st_core(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int,
+    multiplier: float,
+    lookback: int,
+) -> tuple[bool, bool, bool, bool, float, float]:
     """
-    Returns:
-      - bullish: True where close is above the active Supertrend line
-      - st_line: active Supertrend line
-
-    Uses Wilder-style ATR and starts only once ATR values are available.
+    TR, Wilder ATR, band-carry and direction recurrences in one pass, plus the
+    per-bar breakout test against the prior `lookback` highs. Only running
+    scalars are kept — scan() reads the final state, never the full series.
+
+    Returns (green_now, green_prev, ever_red, fired_before, st_now, prior_high):
+      - green_now / green_prev: Supertrend direction on the last two bars
+      - ever_red: some bar (warmup bars included) was not green
+      - fired_before: green AND close > prior 13W high on any bar before today
+      - st_now: today's active Supertrend line
+      - prior_high: highest high of the `lookback` bars before today
     """
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-
-    # Wilder's smoothed ATR
-    tr = pd.concat(
-        [
-            high - low,
-            (high - close.shift(1)).abs(),
-            (low - close.shift(1)).abs(),
-        ],
-        axis=1,
-    ).max(axis=1)
-    atr = tr.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
-
-    hl2 = (high + low) / 2
-    upper_basic = hl2 + multiplier * atr
-    lower_basic = hl2 - multiplier * atr
-
-    upper = pd.Series(index=df.index, dtype=float)
-    lower = pd.Series(index=df.index, dtype=float)
-    st_line = pd.Series(index=df.index, dtype=float)
-    bullish = pd.Series(False, index=df.index, dtype=bool)
-
-    first_valid = atr.first_valid_index()
-    if first_valid is None:
-        return bullish, st_line
-
-    start = df.index.get_loc(first_valid)
-    upper.iloc[start] = upper_basic.iloc[start]
-    lower.iloc[start] = lower_basic.iloc[start]
-
-    # Seed the initial state from price vs the lower band at the first valid bar.
-    bullish.iloc[start] = close.iloc[start] >= lower.iloc[start]
-    st_line.iloc[start] = lower.iloc[start] if bullish.iloc[start] else upper.iloc[start]
-
-    for i in range(start + 1, len(df)):
-        prev_upper = upper.iloc[i - 1]
-        prev_lower = lower.iloc[i - 1]
-        prev_close = close.iloc[i - 1]
-
-        upper.iloc[i] = (
-            upper_basic.iloc[i]
-            if upper_basic.iloc[i] < prev_upper or prev_close > prev_upper
-            else prev_upper
-        )
-        lower.iloc[i] = (
-            lower_basic.iloc[i]
-            if lower_basic.iloc[i] > prev_lower or prev_close < prev_lower
-            else prev_lower
-        )
-
-        prev_bullish = bullish.iloc[i - 1]
-        if prev_bullish:
-            bullish.iloc[i] = close.iloc[i] >= lower.iloc[i]
+    n = len(close)
+    start = period - 1  # first bar with min_periods ATR values
+    prior_high = np.max(high[n - 1 - lookback : n - 1]) if n > lookback else np.nan
+    if n <= start:
+        return False, False, True, False, np.nan, prior_high
+
+    # Wilder's smoothed ATR — ewm(alpha=1/period, adjust=False); TR[0] = H-L.
+    # Bars before `start` only warm up the ATR: they have no Supertrend and
+    # count as not green.
+    alpha = 1.0 / period
+    atr = high[0] - low[0]
+    upper = lower = 0.0
+    green_prev = bull = False
+    ever_red = start > 0
+    fired_before = False
+
+    for i in range(n):
+        if i > 0:
+            prev_close = close[i - 1]
+            tr = max(
+                high[i] - low[i],
+                abs(high[i] - prev_close),
+                abs(low[i] - prev_close),
+            )
+            atr = alpha * tr + (1.0 - alpha) * atr
+        if i < start:
+            continue
+
+        hl2 = (high[i] + low[i]) / 2
+        upper_basic = hl2 + multiplier * atr
+        lower_basic = hl2 - multiplier * atr
+
+        if i == start:
+            # Seed the state from price vs the lower band at the first valid bar
+            upper, lower = upper_basic, lower_basic
+            bull = close[i] >= lower
+            ever_red = ever_red or not bull
+            continue
+
+        # Breakout test for the bar just settled — today's is left to scan()
+        j = i - 1
+        if bull and not fired_before and j >= lookback:
+            fired_before = close[j] > np.max(high[j - lookback : j])
+
+        prev_upper = upper
+        prev_lower = lower
+        if upper_basic < prev_upper or prev_close > prev_upper:
+            upper = upper_basic
+        if lower_basic > prev_lower or prev_close < prev_lower:
+            lower = lower_basic
+
+        green_prev = bull
+        if bull:
+            bull = close[i] >= lower
         else:
-            bullish.iloc[i] = close.iloc[i] > upper.iloc[i]
+            bull = close[i] > upper
+        if not bull:
+            ever_red = True
 
-        st_line.iloc[i] = lower.iloc[i] if bullish.iloc[i] else upper.iloc[i]
-
-    return bullish, st_line
+    st_now = lower if bull else upper
+    return bull, green_prev, ever_red, fired_before, st_now, prior_high
 
 
 class EverestStrategy(BaseStrategy):
@@ -105,45 +118,44 @@ class EverestStrategy(BaseStrategy):
         if len(data) < min_bars:
             return None
 
-        close = data["Close"]
-        high = data["High"]
+        close = data["Close"].to_numpy(dtype=np.float64)
 
-        # ── Condition 2: compute full Supertrend series ───────────────────
-        is_green, st_line = _supertrend(data, period=7, multiplier=3.0)
+        # ── Supertrend(7, 3) + 13W breakout state, final bar only ─────────
+        green_now, green_prev, ever_red, fired_before, st_now, prior_high = _st_core(
+            data["High"].to_numpy(dtype=np.float64),
+            data["Low"].to_numpy(dtype=np.float64),
+            close,
+            7,
+            3.0,
+            lookback,
+        )
 
-        # Supertrend must be green today
-        if not bool(is_green.iloc[-1]):
+        # Condition 2: Supertrend must be green today
+        if not green_now:
             return None
 
         # Supertrend must have been red at some prior point — if it has been
         # green the entire history we have no meaningful "first flip" anchor
-        if not bool((~is_green).any()):
+        if not ever_red:
             return None
 
-        # ── Condition 1: rolling 13W high per bar ─────────────────────────
-        # shift(1) so each bar's "prior high" excludes itself
-        rolling_high = high.shift(1).rolling(lookback).max()
-
-        above_high_series = close > rolling_high
-
-        # ── Condition 3: today is the FIRST bar where both are true ───────
-        both_true = is_green & above_high_series
-
-        if not bool(both_true.iloc[-1]):
+        # Condition 1: today's close above the prior 13W high (NaN → False)
+        today_close = float(close[-1])
+        prior_high = float(prior_high)
+        if not today_close > prior_high:
             return None
 
-        if bool(both_true.iloc[:-1].any()):
+        # Condition 3: today is the FIRST bar where both are true
+        if fired_before:
             return None  # signal already fired on a prior bar
 
         # ── Build result ──────────────────────────────────────────────────
-        today_close = float(close.iloc[-1])
-        prior_high = float(rolling_high.iloc[-1])
-        st_val = round(float(st_line.iloc[-1]), 2)
+        st_val = round(float(st_now), 2)
 
         pct_above_st = round(((today_close - st_val) / st_val) * 100, 2)
         pct_breakout = round(((today_close - prior_high) / prior_high) * 100, 2)
 
-        flipped_today = not bool(is_green.iloc[-2])
+        flipped_today = not green_prev
         strength = "Strong" if flipped_today else "Moderate"
 
         return {
@@ -1,8 +1,12 @@
 """Golden Cross — 50 SMA crossed above 200 SMA in last 5 bars."""
 
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from .base import BaseStrategy
 
+_LOOKBACK = 5  # bars in which a cross counts
+
 
 class GoldenCrossStrategy(BaseStrategy):
     name = "Golden Cross (50/200 SMA)"
@@ -10,29 +14,30 @@ class GoldenCrossStrategy(BaseStrategy):
     _period_days = 365  # need 1 year of data for 200-day SMA
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
+        close = data["Close"].to_numpy(dtype=np.float64)
         if len(close) < 205:
             return None
 
-        sma50 = close.rolling(50).mean()
-        sma200 = close.rolling(200).mean()
-
-        for i in range(-5, 0):
-            p50, p200 = float(sma50.iloc[i - 1]), float(sma200.iloc[i - 1])
-            c50, c200 = float(sma50.iloc[i]), float(sma200.iloc[i])
-            if pd.isna(p50) or pd.isna(p200):
-                continue
-            if p50 < p200 and c50 > c200:
-                gap = round(((c50 - c200) / c200) * 100, 2)
-                return {
-                    "ticker": symbol,
-                    "price": round(float(close.iloc[-1]), 2),
-                    "change_pct": self._price_change(close),
-                    "sma_50": round(c50, 2),
-                    "sma_200": round(c200, 2),
-                    "signal": "Golden Cross",
-                    "strength": "Strong",
-                    "metric_label": "SMA50/200 Gap",
-                    "metric_value": f"+{gap}%",
-                }
-        return None
+        # Only the SMAs of the last LOOKBACK bars (+ the bar before) are needed
+        n = _LOOKBACK + 1
+        sma50 = sliding_window_view(close[-(50 + n - 1) :], 50).mean(axis=1)
+        sma200 = sliding_window_view(close[-(200 + n - 1) :], 200).mean(axis=1)
+
+        cross = (sma50[:-1] < sma200[:-1]) & (sma50[1:] > sma200[1:])
+        if not cross.any():
+            return None
+
+        i = int(np.argmax(cross)) + 1  # earliest cross bar in the window
+        c50, c200 = float(sma50[i]), float(sma200[i])
+        gap = round(((c50 - c200) / c200) * 100, 2)
+        return {
+            "ticker": symbol,
+            "price": round(float(close[-1]), 2),
+            "change_pct": self._price_change(close),
+            "sma_50": round(c50, 2),
+            "sma_200": round(c200, 2),
+            "signal": "Golden Cross",
+            "strength": "Strong",
+            "metric_label": "SMA50/200 Gap",
+            "metric_value": f"+{gap}%",
+        }
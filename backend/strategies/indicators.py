@@ -0,0 +1,72 @@
+"""
+Shared indicator kernels.
+
+Recurrence-style indicators (EMA, MACD) can't be vectorised without
+temporaries, so they run as plain loops over float64 arrays, compiled
+with Numba when available. Callers convert with `.to_numpy()` once and
+keep pandas out of the hot path. Kernels are compiled `nogil`, so a scan's
+indicator math doesn't hold the GIL against fetch threads or other scans.
+
+Strategies only read the last few bars, so kernels carry the recurrence in
+scalars and write just the final `n_out` values — no per-bar output array.
+A call costs a few microseconds, so results are recomputed, not memoised.
+"""
+
+import numpy as np
+from ._njit import njit
+
+
+@njit(cache=True, nogil=True)
+def emas_last(x: np.ndarray, spans: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Last n_out values of `Series.ewm(span=s, adjust=False).mean()` for every
+    span s, as a (len(spans), n_out) array — all EMAs advance in one pass.
+    """
+    n = len(x)
+    k = len(spans)
+    n_out = min(n_out, n)
+    out = np.empty((k, n_out))
+    if n == 0:
+        return out
+    first = n - n_out
+    alpha = 2.0 / (spans + 1.0)
+    e = np.full(k, x[0])
+    for i in range(n):
+        if i > 0:
+            for j in range(k):
+                e[j] = alpha[j] * x[i] + (1.0 - alpha[j]) * e[j]
+        if i >= first:
+            for j in range(k):
+                out[j, i - first] = e[j]
+    return out
+
+
+@njit(cache=True, nogil=True)
+def macd_last(
+    close: np.ndarray, fast: int, slow: int, signal: int, n_out: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Last n_out values of the MACD and signal lines, in one pass over close."""
+    n = len(close)
+    n_out = min(n_out, n)
+    macd = np.empty(n_out)
+    sig = np.empty(n_out)
+    if n == 0:
+        return macd, sig
+    first = n - n_out
+    a_fast = 2.0 / (fast + 1)
+    a_slow = 2.0 / (slow + 1)
+    a_sig = 2.0 / (signal + 1)
+    e_fast = close[0]
+    e_slow = close[0]
+    m = e_fast - e_slow
+    s = m
+    for i in range(n):
+        if i > 0:
+            e_fast = a_fast * close[i] + (1.0 - a_fast) * e_fast
+            e_slow = a_slow * close[i] + (1.0 - a_slow) * e_slow
+            m = e_fast - e_slow
+            s = a_sig * m + (1.0 - a_sig) * s
+        if i >= first:
+            macd[i - first] = m
+            sig[i - first] = s
+    return macd, sig
@@ -1,7 +1,9 @@
 """MACD Bullish Crossover — MACD line crossed above Signal in last 3 bars."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
+from .indicators import macd_last
 
 
 class MACDCrossoverStrategy(BaseStrategy):
@@ -11,29 +13,27 @@ class MACDCrossoverStrategy(BaseStrategy):
     )
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
-        if len(close) < 40:
+        if len(data) < 40:
             return None
 
-        ema12 = close.ewm(span=12, adjust=False).mean()
-        ema26 = close.ewm(span=26, adjust=False).mean()
-        macd = ema12 - ema26
-        signal = macd.ewm(span=9, adjust=False).mean()
-        hist = macd - signal
+        close = data["Close"].to_numpy(dtype=np.float64)
+        macd, signal = macd_last(close, 12, 26, 9, 4)  # the crossover reads 4 bars
 
-        for i in range(-3, 0):
-            if macd.iloc[i - 1] < signal.iloc[i - 1] and macd.iloc[i] > signal.iloc[i]:
-                h = round(float(hist.iloc[-1]), 4)
-                return {
-                    "ticker": symbol,
-                    "price": round(float(close.iloc[-1]), 2),
-                    "change_pct": self._price_change(close),
-                    "macd": round(float(macd.iloc[-1]), 4),
-                    "signal_line": round(float(signal.iloc[-1]), 4),
-                    "histogram": h,
-                    "signal": "MACD Bullish Crossover",
-                    "strength": "Strong" if h > 0 else "Moderate",
-                    "metric_label": "Histogram",
-                    "metric_value": f"{h:+.3f}",
-                }
-        return None
+        # Crossed up on one of the last 3 bars: below on the bar before, above on it
+        cross = (macd[-4:-1] < signal[-4:-1]) & (macd[-3:] > signal[-3:])
+        if not cross.any():
+            return None
+
+        h = round(float(macd[-1] - signal[-1]), 4)
+        return {
+            "ticker": symbol,
+            "price": round(float(close[-1]), 2),
+            "change_pct": self._price_change(close),
+            "macd": round(float(macd[-1]), 4),
+            "signal_line": round(float(signal[-1]), 4),
+            "histogram": h,
+            "signal": "MACD Bullish Crossover",
+            "strength": "Strong" if h > 0 else "Moderate",
+            "metric_label": "Histogram",
+            "metric_value": f"{h:+.3f}",
+        }
@@ -1,15 +1,34 @@
 """RSI Oversold — RSI(14) < 35, potential mean-reversion bounce."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
-
-
-def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
-    delta = close.diff()
-    gain = delta.clip(lower=0).ewm(com=period - 1, min_periods=period).mean()
-    loss = (-delta.clip(upper=0)).ewm(com=period - 1, min_periods=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+from ._njit import njit
+
+
+@njit(cache=True, nogil=True)
+def _rsi_last(close: np.ndarray, n: int) -> float:
+    """
+    Final RSI value with Wilder smoothing, matching pandas
+    `ewm(com=n - 1, min_periods=n).mean()` (adjust=True) on gains/losses.
+    Only the running sums are kept — no per-bar output.
+    """
+    if len(close) <= n:
+        return np.nan
+    decay = 1.0 - 1.0 / n
+    g_num = l_num = den = 0.0
+    for i in range(1, len(close)):
+        delta = close[i] - close[i - 1]
+        g_num = max(delta, 0.0) + decay * g_num
+        l_num = max(-delta, 0.0) + decay * l_num
+        den = 1.0 + decay * den
+    gain = g_num / den
+    loss = l_num / den
+    if loss > 0.0:
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+    if gain > 0.0:
+        return 100.0
+    return np.nan
 
 
 class RSIOversoldStrategy(BaseStrategy):
@@ -20,15 +39,15 @@ class RSIOversoldStrategy(BaseStrategy):
         self.threshold = threshold
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
-        if len(close) < 20:
+        if len(data) < 20:
             return None
 
-        rsi_val = float(_rsi(close).iloc[-1])
+        close = data["Close"].to_numpy(dtype=np.float64)
+        rsi_val = float(_rsi_last(close, 14))
         if rsi_val < self.threshold:
             return {
                 "ticker": symbol,
-                "price": round(float(close.iloc[-1]), 2),
+                "price": round(float(close[-1]), 2),
                 "change_pct": self._price_change(close),
                 "rsi": round(rsi_val, 1),
                 "signal": f"RSI Oversold @ {rsi_val:.1f}",
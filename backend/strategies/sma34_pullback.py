@@ -1,5 +1,6 @@
 """34 SMA Pullback — uptrend, daily candle touches 34 SMA, closes above it."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
 
@@ -15,22 +16,18 @@ class SMA34PullbackStrategy(BaseStrategy):
         if len(data) < 55:
             return None
 
-        open_ = data["Open"].squeeze()
-        close = data["Close"].squeeze()
-        high = data["High"].squeeze()
-        low = data["Low"].squeeze()
+        close = data["Close"].to_numpy(dtype=np.float64)
 
-        sma34 = close.rolling(34).mean()
-        sma50 = close.rolling(50).mean()
-        sma_now = float(sma34.iloc[-1])
-        sma_prev = float(sma34.iloc[-6])
-        sma50_now = float(sma50.iloc[-1])
-        day_open = float(open_.iloc[-1])
-        price = float(close.iloc[-1])
-        day_high = float(high.iloc[-1])
-        day_low = float(low.iloc[-1])
+        # Only three SMA values are read — average just those windows
+        sma_now = float(close[-34:].mean())
+        sma_prev = float(close[-39:-5].mean())  # 34 SMA five bars ago
+        sma50_now = float(close[-50:].mean())
+        day_open = float(data["Open"].to_numpy(dtype=np.float64)[-1])
+        price = float(close[-1])
+        day_high = float(data["High"].to_numpy(dtype=np.float64)[-1])
+        day_low = float(data["Low"].to_numpy(dtype=np.float64)[-1])
 
-        if pd.isna(sma_now) or pd.isna(sma_prev) or pd.isna(sma50_now):
+        if np.isnan(sma_now) or np.isnan(sma_prev) or np.isnan(sma50_now):
             return None
 
         # Define uptrend as price above the 34 SMA, 34 SMA rising,
@@ -1,5 +1,6 @@
 """Volume Surge — 3x+ average volume with meaningful price move."""
 
+import numpy as np
 import pandas as pd
 from .base import BaseStrategy
 
@@ -13,14 +14,14 @@ class VolumeSurgeStrategy(BaseStrategy):
         self.min_change = min_change
 
     def scan(self, symbol: str, data: pd.DataFrame) -> dict | None:
-        close = data["Close"].squeeze()
-        volume = data["Volume"].squeeze()
+        close = data["Close"].to_numpy(dtype=np.float64)
+        volume = data["Volume"].to_numpy(dtype=np.float64)
         if len(close) < 25:
             return None
 
-        avg_vol = float(volume.iloc[-21:-1].mean())
-        cur_vol = float(volume.iloc[-1])
-        price = float(close.iloc[-1])
+        avg_vol = float(volume[-21:-1].mean())
+        cur_vol = float(volume[-1])
+        price = float(close[-1])
         chg = self._price_change(close)
         vol_ratio = round(cur_vol / avg_vol, 2) if avg_vol > 0 else 0
 
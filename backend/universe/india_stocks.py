@@ -55,6 +55,10 @@ _BASE_URLS = [
 _cache: dict[str, list[str]] = {}
 _cache_time: dict[str, float] = {}
 _cache_lock = threading.Lock()
+# One fetch per index at a time — concurrent callers wait for it, then hit _cache
+_fetch_locks: dict[str, threading.Lock] = {
+    name: threading.Lock() for name in _CSV_FILES
+}
 
 _session = requests.Session()
 _session.headers.update(
@@ -70,6 +74,15 @@ _session.headers.update(
         "Connection": "keep-alive",
     }
 )
+# Startup warms every index at once, each racing all mirrors: size the pool so
+# none of those connections is discarded (requests' default keeps 10 per host).
+_session.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(
+        pool_connections=len(_BASE_URLS),
+        pool_maxsize=len(_CSV_FILES) * len(_BASE_URLS),
+    ),
+)
 
 
 def _normalize_symbol(value: str) -> str:
@@ -194,19 +207,32 @@ def get_universe(name: str) -> list[str]:
         log.warning("Unknown universe: %s", name)
         return []
 
-    now = time.time()
-    with _cache_lock:
-        if name in _cache and (now - _cache_time.get(name, 0)) < CACHE_TTL:
-            return list(_cache[name])
+    cached = _cached_universe(name)
+    if cached is not None:
+        return cached
 
-    symbols = _fetch_csv(name)
-    if symbols:
-        with _cache_lock:
-            _cache[name] = symbols
-            _cache_time[name] = now
+    with _fetch_locks[name]:
+        # Another thread may have fetched it while we waited
+        cached = _cached_universe(name)
+        if cached is not None:
+            return cached
+
+        now = time.time()
+        symbols = _fetch_csv(name)
+        if symbols:
+            with _cache_lock:
+                _cache[name] = symbols
+                _cache_time[name] = now
 
     return symbols
 
 
+def _cached_universe(name: str) -> list[str] | None:
+    with _cache_lock:
+        if name in _cache and (time.time() - _cache_time.get(name, 0)) < CACHE_TTL:
+            return list(_cache[name])
+    return None
+
+
 def get_universe_names() -> list[str]:
     return list(_CSV_FILES.keys())